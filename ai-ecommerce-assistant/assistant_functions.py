@@ -1,11 +1,265 @@
-import json
+import functools
+import mmap
 import os
+import pickle
+import sys
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+import numpy as np
+import orjson
+import pygtrie
+
+# 🚀 Optional streaming JSON parser for large catalogs (falls back to orjson)
+try:
+    import ijson
+except ImportError:  # pragma: no cover - depends on the environment
+    ijson = None
+
 # AI E-Commerce Assistant - ShopBot
 # Author: Manuela Cortés Granados
 # Since: 2025-05-16 1:34 AM GMT -5:00
 # Description: Python app using OpenAI’s GPT-4o model to create a virtual e-commerce assistant
 #              that can provide product information and check stock availability.
 
+# 🧱 Compact, immutable product record: a namedtuple stores its fields in a tuple
+#    instead of a per-product hash table, so it needs far less memory than a dict.
+#    Use `._asdict()` where a dict is required.
+Product = namedtuple("Product", "id name description price stock card")
+
+
+# ✅ SRP: This container only holds the loaded catalog and its lookup index.
+# eq=False keeps identity hashing, so a Catalog can be part of a memoization key.
+@dataclass(eq=False)
+class Catalog:
+    """
+    🗂️ In-memory product catalog with a precomputed name index.
+
+    Per-product data is kept in parallel arrays sharing one position `i`.
+
+    Attributes:
+        products (list[Product]): The products, in file order.
+        lower_names (list[str]): `products[i].name.lower()`, computed once at load time.
+        name_to_idx (dict[str, int]): Maps each lowercased name to its position, so
+            lookups are a single hash probe instead of a scan over the list.
+        name_trie (pygtrie.CharTrie): The same mapping as a character trie, used for
+            prefix and approximate matches when the exact name is not found. Built
+            lazily on first use and never pickled, since only lookup misses need it.
+        prices (np.ndarray[float32]): `products[i].price`, contiguous for vectorized
+            aggregates (e.g. the cheapest item). `Product.price` keeps the exact value.
+        stocks (np.ndarray[int32]): `products[i].stock`.
+        in_stock_mask (np.ndarray[bool]): `stocks > 0`, computed once at load time.
+    """
+    products: list = field(default_factory=list)
+    lower_names: list = field(default_factory=list)
+    name_to_idx: dict = field(default_factory=dict)
+    _name_trie: pygtrie.CharTrie = field(default=None, init=False, repr=False)
+    prices: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32))
+    stocks: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    in_stock_mask: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=bool))
+
+    @property
+    def name_trie(self):
+        # 🌳 Pure-Python trie: building it is costly, so wait for the first miss
+        if self._name_trie is None:
+            self._name_trie = pygtrie.CharTrie(self.name_to_idx)
+        return self._name_trie
+
+    def __getstate__(self):
+        # 💾 Leave the trie out of the pickle cache; it is rebuilt on demand
+        state = self.__dict__.copy()
+        state["_name_trie"] = None
+        return state
+
+    def __iter__(self):
+        # 🔁 Iterating a Catalog yields its products, like the plain list it replaces
+        return iter(self.products)
+
+    def __len__(self):
+        return len(self.products)
+
+
+# 📏 Catalog files larger than this are memory-mapped and stream-parsed
+LARGE_CATALOG_THRESHOLD_BYTES = 10 * 1024 * 1024
+
+
+# 💾 Bump when the pickled Catalog layout changes, so stale caches are ignored
+CATALOG_CACHE_VERSION = 8
+
+
+# ✅ SRP: Only formats a product for display.
+def format_product_card(product):
+    """
+    🪪 Formats a product as the multi-line "card" the assistant shows to users.
+
+    Args:
+        product (dict): A parsed product with name, description, price and stock.
+
+    Returns:
+        str: The formatted product card.
+    """
+    return (
+        f"🛍️ Product: {product['name']}\n"
+        f"📄 Description: {product['description']}\n"
+        f"💲 Price: ${product['price']:.2f}\n"
+        f"📦 Stock: {product['stock']} units"
+    )
+
+
+# 🧪 Fixed product used to fingerprint the card format stored in the cache
+_CARD_FORMAT_SAMPLE = {"name": "Sample", "description": "Sample", "price": 1.5, "stock": 2}
+
+
+def _card_format_fingerprint():
+    """
+    🧪 Returns the card `format_product_card` produces for a fixed sample product.
+
+    Cards are precomputed and pickled with the catalog, so the cache stores this
+    fingerprint too: any change to the card format invalidates the cache even
+    when the catalog JSON itself is unchanged.
+    """
+    return format_product_card(_CARD_FORMAT_SAMPLE)
+
+
+# ✅ SRP: Only turns an iterable of parsed product dicts into an indexed Catalog.
+def _build_catalog(products):
+    """
+    🗂️ Builds a `Catalog` from parsed product dictionaries, converting each one to
+    a `Product` and lowercasing and indexing each name exactly once so later
+    queries are O(1).
+
+    Each product's display card is also formatted once here and stored in
+    `Product.card`, so repeated questions about a product reuse the same string.
+
+    Names and their lowercased forms are interned with `sys.intern` (see
+    `_intern_names`, which restores this for catalogs loaded from the cache).
+
+    If two products share a name, the first one wins, as with a linear scan.
+    """
+    catalog = Catalog()
+    for raw_product in products:
+        product = Product(
+            id=raw_product["id"],
+            name=sys.intern(raw_product["name"]),
+            description=raw_product["description"],
+            price=raw_product["price"],
+            stock=raw_product["stock"],
+            card=format_product_card(raw_product),
+        )
+        # 🔗 Interned, so the index key, the lower_names entry and any equal name
+        #    elsewhere are one shared object and equality checks can stop at `is`
+        lower_name = sys.intern(product.name.lower())
+        index = catalog.name_to_idx.setdefault(lower_name, len(catalog.products))
+        catalog.products.append(product)
+        catalog.lower_names.append(lower_name)
+
+    # 📊 Numeric columns as narrow, contiguous NumPy arrays
+    count = len(catalog.products)
+    catalog.prices = np.fromiter(
+        (product.price for product in catalog.products), dtype=np.float32, count=count
+    )
+    catalog.stocks = np.fromiter(
+        (product.stock for product in catalog.products), dtype=np.int32, count=count
+    )
+    catalog.in_stock_mask = catalog.stocks > 0
+    return catalog
+
+
+# ✅ SRP: Only re-interns the names of an already built Catalog.
+def _intern_names(catalog):
+    """
+    🔗 Interns product names and lowercased index keys in place.
+
+    Unpickled strings are not interned, so a catalog read from the cache goes
+    through this O(N) pass to match one freshly built by `_build_catalog`.
+    """
+    for index, product in enumerate(catalog.products):
+        name = sys.intern(product.name)
+        if name is not product.name:
+            catalog.products[index] = product._replace(name=name)
+        catalog.lower_names[index] = sys.intern(catalog.lower_names[index])
+    catalog.name_to_idx = {
+        sys.intern(lower_name): index for lower_name, index in catalog.name_to_idx.items()
+    }
+
+
+# ✅ SRP: Only builds a Catalog from a file; the caller decides which file.
+def _parse_catalog(path):
+    """
+    🧩 Parses the catalog JSON file at `path` into a `Catalog`.
+
+    JSON is decoded with orjson (a C extension) straight from UTF-8 bytes, with
+    no intermediate `str`. Files above `LARGE_CATALOG_THRESHOLD_BYTES` are
+    memory-mapped read-only, so the kernel pages them in on demand instead of
+    copying them into memory first, and are streamed with ijson (when installed)
+    or handed to orjson as a zero-copy memoryview.
+    """
+    if os.path.getsize(path) <= LARGE_CATALOG_THRESHOLD_BYTES:
+        # 📖 Read the raw UTF-8 bytes; orjson decodes them directly
+        with open(path, 'rb') as file:
+            return _build_catalog(orjson.loads(file.read()))
+
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if ijson is not None:
+                # 🌊 use_float keeps prices as float instead of Decimal
+                return _build_catalog(ijson.items(mapped, 'item', use_float=True))
+            # 📖 orjson parses the mapping in place; the view is released before unmapping
+            with memoryview(mapped) as view:
+                return _build_catalog(orjson.loads(view))
+
+
+# ✅ SRP: Only reads a previously pickled Catalog; parsing stays in _parse_catalog.
+def _read_cached_catalog(cache_path, source_mtime_ns):
+    """
+    💾 Returns the Catalog pickled at `cache_path` if it was built from a source
+    file with the same modification time and with the current card format,
+    otherwise `None`.
+
+    A missing, unreadable or outdated cache is treated as a cache miss. This
+    includes caches whose classes can no longer be imported (e.g. after a
+    numpy or pygtrie upgrade): the cache is only an optimization.
+    """
+    try:
+        with open(cache_path, 'rb') as file:
+            version, mtime_ns, card_format, catalog = pickle.load(file)
+    except Exception:
+        return None
+
+    if (
+        version != CATALOG_CACHE_VERSION
+        or mtime_ns != source_mtime_ns
+        or card_format != _card_format_fingerprint()
+    ):
+        return None
+    return catalog
+
+
+# ✅ SRP: Only persists a Catalog next to its source file.
+def _write_cached_catalog(cache_path, source_mtime_ns, catalog):
+    """
+    💾 Pickles `catalog` to `cache_path`, tagged with the source file's mtime and
+    the current card format fingerprint.
+
+    The file is written to a temporary path and renamed into place, so a
+    concurrent reader never sees a half-written cache. Write errors (e.g. a
+    read-only directory) are ignored: the cache is only an optimization.
+    """
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            cache_entry = (
+                CATALOG_CACHE_VERSION, source_mtime_ns, _card_format_fingerprint(), catalog
+            )
+            pickle.dump(cache_entry, file, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
 # ✅ SRP (Single Responsibility Principle): 
 # This function has one clear responsibility — loading the product catalog from a JSON file.
 def load_product_catalog():
@@ -14,33 +268,161 @@ def load_product_catalog():
 
     📍 Location: The file is expected to be in the same directory as this script.
 
+    💾 Cache: The parsed catalog is pickled to `product_catalog.cache.pkl` next to
+    the JSON file and reused on later runs while the JSON file's modification
+    time is unchanged, skipping the JSON parse entirely.
+
     Returns:
-        list[dict]: A list of product dictionaries containing keys such as:
-            - id (int)
+        Catalog: The product list plus a lowercased-name index. Each product is a
+        `Product` namedtuple with the fields:
+            - id (str)
             - name (str)
             - description (str)
             - price (float)
             - stock (int)
+            - card (str)
 
     💥 Raises:
         FileNotFoundError: If the catalog file does not exist.
-        json.JSONDecodeError: If the file content is not valid JSON.
+        orjson.JSONDecodeError: If the file content is not valid JSON
+            (a subclass of `json.JSONDecodeError`).
+        ijson.JSONError: If a large, stream-parsed file is not valid JSON.
 
     🧠 SOLID Principles:
-        - SRP: Dedicated solely to file reading and JSON parsing.
+        - SRP: Dedicated solely to file reading, JSON parsing and index building.
         - OCP: You can extend this to read from APIs or databases later without modifying this function.
     """
     # 📁 Build absolute path to the product catalog file
     path = os.path.join(os.path.dirname(__file__), 'product_catalog.json')
+    cache_path = os.path.join(os.path.dirname(__file__), 'product_catalog.cache.pkl')
 
-    # 📖 Read the file content safely using UTF-8 encoding
-    with open(path, 'r', encoding='utf-8') as file:
-        catalog = json.load(file)
+    # 💾 Reuse the pickled catalog if the JSON file has not changed since
+    source_mtime_ns = os.stat(path).st_mtime_ns
+    catalog = _read_cached_catalog(cache_path, source_mtime_ns)
+    if catalog is None:
+        catalog = _parse_catalog(path)
+        _write_cached_catalog(cache_path, source_mtime_ns, catalog)
+    else:
+        # 🔗 Pickle does not preserve interning; restore it for the cached catalog
+        _intern_names(catalog)
 
-    # ✅ Return the parsed product list
+    # ✅ Return the parsed product list together with its index
     return catalog
 
 
+# 🔤 Query words shorter than this must match a product word exactly; longer
+#    ones may also be the start of a word ("eco" -> "ecofriendly")
+MIN_PARTIAL_WORD_LENGTH = 3
+
+
+def _matches_word(query_word, word):
+    """🔤 True if `query_word` is `word`, or a long enough start of it."""
+    return query_word == word or (
+        len(query_word) >= MIN_PARTIAL_WORD_LENGTH and word.startswith(query_word)
+    )
+
+
+# ✅ SRP: Only handles names that are not an exact match.
+def _approximate_lookup(catalog, name_lower):
+    """
+    🧭 Finds the catalog position for a name that is close to, but not exactly,
+    a product name. Matches always end on a word boundary. Tried in order:
+
+        1. Completion: the name is made of the leading whole words of exactly
+           one product name ("wireless" -> "wireless earbuds").
+        2. Longest prefix: the query starts with a whole product name
+           ("yoga mat large" -> "yoga mat").
+        3. Word match: every word of the query matches a word of exactly one
+           product name, where words of `MIN_PARTIAL_WORD_LENGTH` or more
+           characters may be the start of a word
+           ("eco water bottle" -> "ecofriendly water bottle").
+
+    Returns `None` when nothing matches or the match is ambiguous.
+
+    Example:
+        >>> catalog = _build_catalog([
+        ...     {"id": "P1", "name": "Yoga Mat", "description": "", "price": 1.0, "stock": 1},
+        ...     {"id": "P2", "name": "Portable Charger", "description": "", "price": 1.0, "stock": 1},
+        ...     {"id": "P3", "name": "EcoFriendly Water Bottle", "description": "", "price": 1.0, "stock": 1},
+        ... ])
+        >>> _approximate_lookup(catalog, "yoga")
+        0
+        >>> _approximate_lookup(catalog, "yoga mat large")
+        0
+        >>> _approximate_lookup(catalog, "eco water bottle")
+        2
+        >>> _approximate_lookup(catalog, "yoga matrix") is None
+        True
+        >>> _approximate_lookup(catalog, "p") is None
+        True
+        >>> _approximate_lookup(catalog, "port")
+        1
+    """
+    trie = catalog.name_trie
+    if not name_lower:
+        return None
+    end = len(name_lower)
+
+    # 1️⃣ O(L) walk to the query's node, then keep the names where the query
+    #    ends exactly before a space (a whole-word prefix)
+    if trie.has_subtrie(name_lower):
+        candidates = {
+            index
+            for lower_name, index in trie.iteritems(prefix=name_lower)
+            if lower_name[end:end + 1] in ("", " ")
+        }
+        if len(candidates) == 1:
+            return candidates.pop()
+
+    # 2️⃣ O(L) walk along the query, keeping the longest product name that is
+    #    followed by a space in the query
+    match = None
+    for step in trie.prefixes(name_lower):
+        if name_lower[len(step.key):len(step.key) + 1] in ("", " "):
+            match = step.value
+    if match is not None:
+        return match
+
+    # 3️⃣ Word-level fallback, only reached on a miss
+    query_words = name_lower.split()
+    matches = {
+        index
+        for lower_name, index in trie.iteritems()
+        if all(
+            any(_matches_word(query_word, word) for word in lower_name.split())
+            for query_word in query_words
+        )
+    }
+    if len(matches) == 1:
+        return matches.pop()
+    return None
+
+
+# ✅ SRP: Resolves a normalized name to its catalog position, nothing else.
+# 🧠 Memoized: users and the model repeat the same names within a conversation,
+#    and both tools resolve the same product, so repeated lookups hit the cache.
+@functools.lru_cache(maxsize=256)
+def _lookup(catalog, name_lower):
+    """
+    🔑 Returns the catalog position of an already-lowercased name, or `None`.
+
+    Callers pass the name through `sys.intern`, so an exact hit finds the
+    interned index key by identity and skips the character comparison.
+
+    Exact names are a single hash probe; anything else falls back to the
+    approximate matching in `_approximate_lookup`, so slightly different
+    phrasings from the user or the model still find the product.
+
+    The catalog is part of the cache key (hashed by identity), so lookups from
+    different catalogs never collide.
+    """
+    index = catalog.name_to_idx.get(name_lower)
+    if index is None:
+        # 🧹 Collapse stray and repeated whitespace so word boundaries are single spaces
+        index = _approximate_lookup(catalog, " ".join(name_lower.split()))
+    return index
+
+
 # ✅ SRP: This function only handles product lookup.
 # ✅ OCP: We can add filters (e.g., by category or price) without changing existing logic.
 def get_product_info(product_name, catalog):
@@ -48,16 +430,18 @@ def get_product_info(product_name, catalog):
     🔍 Fetches detailed information of a product by its name.
 
     Args:
-        product_name (str): Name of the product to search (case-insensitive).
-        catalog (list[dict]): The product catalog list.
+        product_name (str): Name of the product to search (case-insensitive). Partial
+            or slightly different names are matched when they identify one product.
+        catalog (Catalog): The catalog returned by `load_product_catalog`.
 
     Returns:
-        dict | None: A dictionary containing product info if found:
-            - id (int)
+        Product | None: The matching product if found (call `._asdict()` for a dict):
+            - id (str)
             - name (str)
             - description (str)
             - price (float)
             - stock (int)
+            - card (str): The preformatted display card (see `format_product_card`).
         Returns `None` if no product matches the name.
 
     Example:
@@ -66,33 +450,28 @@ def get_product_info(product_name, catalog):
     🧠 SOLID Principles:
         - SRP: Responsible only for searching and returning a single product’s data.
         - OCP: You can easily add logging, metrics, or fallback behavior.
-        - LSP: This function behaves correctly even if the catalog contains subclasses of dict.
-    """
-    # 🔁 Loop through all products in the catalog
-    for product in catalog:
-        # 🆚 Compare names case-insensitively for better UX
-        if product["name"].lower() == product_name.lower():
-            return {
-                "id": product["id"],
-                "name": product["name"],
-                "description": product["description"],
-                "price": product["price"],
-                "stock": product["stock"],
-            }
-
-    # ❌ Product not found
-    return None
+        - LSP: The returned Product is a tuple with named fields, usable wherever a read-only record is expected.
+    """
+    # 🆚 Hash lookup on the lowercased name, with a trie-based fallback for near matches
+    # 🔗 Interned, so an exact hit matches the (interned) index key by identity
+    index = _lookup(catalog, sys.intern(product_name.lower()))
+    if index is None:
+        # ❌ Product not found
+        return None
+
+    # 🧱 Products are immutable, so the shared record is returned without copying
+    return catalog.products[index]
 
 
 # ✅ SRP: Verifies stock availability only.
-# ✅ DIP: Depends on an abstract catalog input (list of dicts), not a specific data source.
+# ✅ DIP: Depends on an abstract catalog input (indexed Catalog), not a specific data source.
 def check_stock(product_name, catalog):
     """
     📦 Checks whether a product is currently in stock.
 
     Args:
         product_name (str): The product name to verify.
-        catalog (list[dict]): The list of product dictionaries.
+        catalog (Catalog): The catalog returned by `load_product_catalog`.
 
     Returns:
         bool: 
@@ -107,12 +486,9 @@ def check_stock(product_name, catalog):
         - LSP: Works with any compatible product catalog data structure.
         - DIP: Accepts the catalog as an injected dependency, enabling flexibility in how data is provided.
     """
-    # 🧾 Get the product details first
-    product = get_product_info(product_name, catalog)
-
-    # 📈 If product exists, check if its stock is positive
-    if product:
-        return product["stock"] > 0
+    # 🧾 Look the product up directly in the index (no record to fetch)
+    index = _lookup(catalog, sys.intern(product_name.lower()))
 
-    # 🛑 Product not found or out of stock
-    return False
+    # 📈 True only if the product exists and its stock is positive
+    # 🛑 Product not found or out of stock -> False
+    return index is not None and bool(catalog.in_stock_mask[index])
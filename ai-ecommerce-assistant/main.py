@@ -1,8 +1,19 @@
-import json
+import asyncio
+import atexit
 import os
-from openai import OpenAI
+import sys
+import threading
+import httpx
+import orjson
+from openai import AsyncOpenAI
 from assistant_functions import load_product_catalog, get_product_info, check_stock
 
+# ⌨️ Line editing and history for the interactive prompt (not available on Windows)
+try:
+    import readline
+except ImportError:  # pragma: no cover - depends on the platform
+    readline = None
+
 # AI E-Commerce Assistant - ShopBot
 # Author: Manuela Cortés Granados
 # Since: 2025-05-16 1:34 AM GMT -5:00
@@ -11,150 +22,376 @@ from assistant_functions import load_product_catalog, get_product_info, check_st
 # This list defines the available functions that the assistant can call
 # Each dictionary here represents a *declarative* schema of a callable function
 # The assistant uses this to understand what capabilities it has access to
-functions = [
+# 🛠️ Declared as "tools" so the model can request several calls in a single response
+tools = [
     {
-        "name": "get_product_info",
-        "description": "Returns details of a product by name.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "product_name": {
-                    "type": "string",
-                    "description": "Name of the product to retrieve details for",
+        "type": "function",
+        "function": {
+            "name": "get_product_info",
+            "description": "Returns details of a product by name.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "product_name": {
+                        "type": "string",
+                        "description": "Name of the product to retrieve details for",
+                    },
                 },
+                "required": ["product_name"],
             },
-            "required": ["product_name"],
         },
     },
     {
-        "name": "check_stock",
-        "description": "Checks if the product is in stock.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "product_name": {
-                    "type": "string",
-                    "description": "Name of the product to check stock for",
+        "type": "function",
+        "function": {
+            "name": "check_stock",
+            "description": "Checks if the product is in stock.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "product_name": {
+                        "type": "string",
+                        "description": "Name of the product to check stock for",
+                    },
                 },
+                "required": ["product_name"],
             },
-            "required": ["product_name"],
         },
     },
 ]
 
-def main():
+# 🧠 System prompt helps define assistant behavior
+# Shared by every conversation and never mutated: each session starts its own
+# `messages` list with a reference to it
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        "Eres ShopBot, un asistente virtual para una tienda online. "
+        "Ayudas a los usuarios a obtener información y disponibilidad de productos."
+    ),
+}
+
+# 📜 Where the interactive prompt history is kept between sessions
+HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".shopbot_history")
+
+# 📏 Maximum number of lines kept in `HISTORY_FILE`
+HISTORY_LENGTH = 1000
+
+# 🪟 Number of most recent user turns (with their tool calls and replies) sent to the model
+MAX_HISTORY_TURNS = 10
+
+
+def trim_history(messages, max_turns=MAX_HISTORY_TURNS):
+    """
+    🪟 Keeps the system prompt plus the last `max_turns` user turns.
+
+    The window is cut at user messages, so an assistant tool call is never
+    separated from its tool results. This caps the tokens sent per request
+    at O(max_turns) instead of growing with the whole conversation.
+
+    Args:
+        messages (list[dict]): Conversation history, starting with the system prompt.
+        max_turns (int): Number of user turns to keep.
+
+    Returns:
+        list[dict]: The trimmed history (the same list if nothing was dropped).
+    """
+    user_indexes = [i for i, message in enumerate(messages) if message["role"] == "user"]
+    if len(user_indexes) <= max_turns:
+        return messages
+    return messages[:1] + messages[user_indexes[-max_turns]:]
+
+
+# 🧱 L: Liskov Substitution — every handler takes (arguments, catalog) and returns text
+# ⚡ Handlers are coroutines so several tool calls can run concurrently; the current
+#    ones are pure Python, but a handler backed by a database or remote stock
+#    service only needs to await it.
+async def _handle_get_product_info(arguments, catalog):
+    """🛍️ Formats the details of the requested product for the assistant."""
+    product_name = arguments.get("product_name", "")
+    product = get_product_info(product_name, catalog)
+    if product:
+        # 🪪 Card was formatted once when the catalog was loaded
+        return product.card
+    return f"❌ No product found with name '{product_name}'."
+
+
+async def _handle_check_stock(arguments, catalog):
+    """📦 Reports whether the requested product is in stock."""
+    product_name = arguments.get("product_name", "")
+    # 🔎 Resolve the product first, so the reply names the product that was
+    #    actually matched rather than echoing the requested name
+    product = get_product_info(product_name, catalog)
+    if product is None:
+        return f"❌ No product found with name '{product_name}'."
+    if check_stock(product.name, catalog):
+        return f"✅ '{product.name}' is available in stock."
+    return f"⚠️ '{product.name}' is currently out of stock."
+
+
+# 🧩 O: Open/Closed Principle — register a handler here to expose a new tool
+DISPATCH = {
+    "get_product_info": _handle_get_product_info,
+    "check_stock": _handle_check_stock,
+}
+
+
+async def execute_function(function_name, arguments_json, catalog):
+    """
+    🧰 Runs one function requested by the assistant and returns its text result.
+
+    Args:
+        function_name (str): Name of the requested function (a key of `DISPATCH`).
+        arguments_json (str): JSON-encoded arguments sent by the model.
+        catalog (Catalog): The loaded product catalog.
+
+    Returns:
+        str: A human-readable result that is sent back to the model.
+    """
+    handler = DISPATCH.get(function_name)
+    if handler is None:
+        return "❓ Unknown function requested."
+
+    try:
+        arguments = orjson.loads(arguments_json)
+    except Exception:
+        arguments = {}
+
+    return await handler(arguments, catalog)
+
+
+def create_openai_client():
+    """
+    🔌 Creates the OpenAI client on top of a shared HTTP/2 connection pool.
+
+    Both completions of a turn (and every later turn) reuse the same kept-alive
+    connection, so TLS handshakes aren't repeated and HTTP/2 compresses the
+    repeated request headers. Closing the returned client closes the pool.
+
+    Returns:
+        AsyncOpenAI: The configured client.
+    """
+    # 🔐 Set your API key before running (env-based for security)
+    # For Windows (PowerShell): setx OPENAI_API_KEY "your_key"
+    # For macOS/Linux: export OPENAI_API_KEY="your_key"
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=4),
+    )
+    return AsyncOpenAI(http_client=http_client)
+
+
+def _save_history():
+    """💾 Writes the prompt history, ignoring errors (e.g. a read-only home directory)."""
+    try:
+        readline.write_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+
+async def _read_line(read):
+    """
+    🧵 Runs the blocking `read()` on a daemon thread and awaits its result.
+
+    Keeping blocking reads off the event loop lets Ctrl-C cancel `main()` right
+    away, even while waiting at the prompt. The thread is a daemon, so a read
+    still pending at exit does not keep the process alive.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+
+    def worker():
+        try:
+            setter, value = future.set_result, read()
+        except BaseException as error:
+            setter, value = future.set_exception, error
+        try:
+            loop.call_soon_threadsafe(deliver, setter, value)
+        except RuntimeError:
+            pass  # 🔚 The loop is already closed: the session has ended
+
+    threading.Thread(target=worker, daemon=True).start()
+    return await future
+
+
+async def read_user_inputs():
+    """
+    ⌨️ Yields user messages until the input ends.
+
+    In a terminal, prompts with "Usuario: " and, when readline is available,
+    offers line editing plus a history persisted in `HISTORY_FILE` (capped at
+    `HISTORY_LENGTH` lines), so product names don't have to be retyped. When
+    stdin is piped (batch mode), lines are read straight from the buffered
+    stream without writing prompts. Reads never block the event loop.
+
+    Yields:
+        str: One user message per line, without the trailing newline.
+    """
+    if not sys.stdin.isatty():
+        while True:
+            line = await _read_line(sys.stdin.readline)
+            if not line:
+                return  # 📭 End of the piped input
+            yield line.rstrip("\n")
+
+    if readline is not None:
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except OSError:
+            pass  # 📭 First run: no history yet
+        readline.set_history_length(HISTORY_LENGTH)
+        atexit.register(_save_history)
+
+    while True:
+        try:
+            yield await _read_line(lambda: input("Usuario: "))
+        except EOFError:
+            print()
+            return
+
+
+async def stream_chat_completion(client, **request):
+    """
+    🌊 Streams a chat completion, printing the reply as tokens arrive.
+
+    Content deltas are written to stdout immediately (prefixed once with
+    "Asistente:"), while tool call deltas are merged by their index until the
+    stream ends.
+
+    Args:
+        client (AsyncOpenAI): The OpenAI client.
+        **request: Arguments forwarded to `client.chat.completions.create`.
+
+    Returns:
+        tuple[str | None, list[dict]]: The full reply text (or `None` if the model
+        produced none) and the requested tool calls, already in the message
+        format expected by the API.
+    """
+    content_parts = []
+    tool_calls = {}
+
+    async for chunk in await client.chat.completions.create(stream=True, **request):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            if not content_parts:
+                print("Asistente: ", end="", flush=True)
+            content_parts.append(delta.content)
+            print(delta.content, end="", flush=True)
+
+        # 🧩 Tool calls arrive in fragments: id/name first, then argument pieces
+        for tool_call_delta in delta.tool_calls or []:
+            tool_call = tool_calls.setdefault(tool_call_delta.index, {
+                "id": None,
+                "type": "function",
+                "function": {"name": "", "arguments": ""},
+            })
+            if tool_call_delta.id:
+                tool_call["id"] = tool_call_delta.id
+            if tool_call_delta.function:
+                if tool_call_delta.function.name:
+                    tool_call["function"]["name"] += tool_call_delta.function.name
+                if tool_call_delta.function.arguments:
+                    tool_call["function"]["arguments"] += tool_call_delta.function.arguments
+
+    if content_parts:
+        print()
+
+    content = "".join(content_parts) if content_parts else None
+    return content, [tool_calls[index] for index in sorted(tool_calls)]
+
+
+async def main():
     """
     🧠 Main entry point for the assistant app.
-    
+
     📌 Responsibilities:
     - Load product data
     - Accept user input
-    - Use OpenAI function calling to interpret and respond
+    - Use OpenAI tool calling to interpret and respond
     - Handle dynamic calls to business logic functions (SRP)
     """
-    
-    # 🔐 Set your API key before running (env-based for security)
-    # For Windows (PowerShell): setx OPENAI_API_KEY "your_key"
-    # For macOS/Linux: export OPENAI_API_KEY="your_key"
-    client = OpenAI()
 
     # 📦 Load the product catalog from local storage
     catalog = load_product_catalog()
 
     print("¡Bienvenido al asistente de e-commerce! Escribe 'salir' para terminar.\n")
 
-    # 🧠 System prompt helps define assistant behavior
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "Eres ShopBot, un asistente virtual para una tienda online. "
-                "Ayudas a los usuarios a obtener información y disponibilidad de productos."
-            ),
-        }
-    ]
+    # 🧠 Every conversation starts from the shared system prompt
+    messages = [SYSTEM_MESSAGE]
 
-    while True:
-        user_input = input("Usuario: ")
-        if user_input.lower() in ["salir", "exit", "quit"]:
-            print("Asistente: ¡Gracias por usar el asistente! Hasta luego.")
-            break
-
-        # Add user message to conversation context
-        messages.append({"role": "user", "content": user_input})
-
-        # 🎯 First call: Let OpenAI decide whether a function call is needed
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            functions=functions,
-            function_call="auto",
-        )
-
-        message = response.choices[0].message
-
-        # 🧩 O: Open/Closed Principle
-        # We can extend with more functions without modifying main logic
-        if hasattr(message, "function_call") and message.function_call is not None:
-            function_name = message.function_call.name
-            arguments_json = message.function_call.arguments
-
-            try:
-                arguments = json.loads(arguments_json)
-            except Exception:
-                arguments = {}
-
-            # 🧱 L: Liskov Substitution — consistent output for each function
-            # 📌 Dynamically handle supported function calls
-            if function_name == "get_product_info":
-                product_name = arguments.get("product_name", "")
-                product = get_product_info(product_name, catalog)
-                if product:
-                    function_response = (
-                        f"🛍️ Product: {product['name']}\n"
-                        f"📄 Description: {product['description']}\n"
-                        f"💲 Price: ${product['price']:.2f}\n"
-                        f"📦 Stock: {product['stock']} units"
-                    )
-                else:
-                    function_response = f"❌ No product found with name '{product_name}'."
-
-            elif function_name == "check_stock":
-                product_name = arguments.get("product_name", "")
-                in_stock = check_stock(product_name, catalog)
-                if in_stock:
-                    function_response = f"✅ '{product_name}' is available in stock."
-                else:
-                    function_response = f"⚠️ '{product_name}' is currently out of stock."
-
-            else:
-                function_response = "❓ Unknown function requested."
-
-            # Add the assistant function result to message history
-            messages.append({
-                "role": "function",
-                "name": function_name,
-                "content": function_response,
-            })
+    # 🔌 One client (and one HTTP/2 connection pool) for the whole session;
+    #    `async with` closes the pool even on API errors or Ctrl-C
+    async with create_openai_client() as client:
+        async for user_input in read_user_inputs():
+            if user_input.lower() in ["salir", "exit", "quit"]:
+                print("Asistente: ¡Gracias por usar el asistente! Hasta luego.")
+                break
+
+            # Add user message to conversation context
+            messages.append({"role": "user", "content": user_input})
 
-            # 🗣️ Second call: Assistant reads the function output and responds naturally
-            second_response = client.chat.completions.create(
+            # 🪟 Only send a bounded window of the conversation
+            messages = trim_history(messages)
+
+            # 🎯 First call: Let OpenAI decide whether any tool calls are needed
+            # 🌊 Streamed, so a direct answer is printed as soon as tokens arrive
+            assistant_reply, tool_calls = await stream_chat_completion(
+                client,
                 model="gpt-4o",
                 messages=messages,
+                tools=tools,
+                tool_choice="auto",
             )
-            assistant_reply = second_response.choices[0].message.content
-            print("Asistente:", assistant_reply)
 
-            # Store assistant message in history
-            messages.append({"role": "assistant", "content": assistant_reply})
+            # 🧩 O: Open/Closed Principle
+            # We can extend with more functions without modifying main logic
+            if tool_calls:
+                # The assistant turn that requested the tools must precede their results
+                messages.append({
+                    "role": "assistant",
+                    "content": assistant_reply,
+                    "tool_calls": tool_calls,
+                })
+
+                # ⚡ Run every requested tool concurrently before going back to the model,
+                # so parallel tool calls still cost a single follow-up round-trip
+                results = await asyncio.gather(*(
+                    execute_function(
+                        tool_call["function"]["name"],
+                        tool_call["function"]["arguments"],
+                        catalog,
+                    )
+                    for tool_call in tool_calls
+                ))
+                for tool_call, result in zip(tool_calls, results):
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call["id"],
+                        "content": result,
+                    })
+
+                # 🗣️ Second call: Assistant reads the tool outputs and responds naturally
+                assistant_reply, _ = await stream_chat_completion(
+                    client,
+                    model="gpt-4o",
+                    messages=messages,
+                )
 
-        else:
-            # 🤖 If no function was called, use the direct model response
-            assistant_reply = message.content
-            print("Asistente:", assistant_reply)
+            # 🤖 Store the (already printed) assistant reply in history
             messages.append({"role": "assistant", "content": assistant_reply})
 
 # ✅ D: Dependency Inversion Principle
 # main() is the high-level module and relies on abstractions, not direct implementations
 if __name__ == "__main__":
-    main()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # ⏹️ Ctrl-C cancels main(); the client has already been closed by then
+        print()